@@ -1,9 +1,25 @@
 from django.contrib import admin
 
-from app.models import LogFile
+from app.models import AlertFiring, AlertRule, LogFile
 
 
 @admin.register(LogFile)
 class LogFileAdmin(admin.ModelAdmin):
-    list_display = ['name', 'path', 'encoding', 'updated_at', 'created_at']
+    list_display = ['name', 'path', 'encoding', 'storm_mode', 'updated_at', 'created_at']
+    list_filter = ['storm_mode']
     search_fields = ['name', 'path', 'encoding']
+
+
+@admin.register(AlertRule)
+class AlertRuleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'threshold', 'window_seconds', 'cooldown_seconds', 'is_active', 'updated_at']
+    list_filter = ['is_active', 'is_regex']
+    search_fields = ['name', 'patterns']
+    filter_horizontal = ['log_files']
+
+
+@admin.register(AlertFiring)
+class AlertFiringAdmin(admin.ModelAdmin):
+    list_display = ['rule', 'log_file', 'match_count', 'created_at']
+    list_filter = ['rule', 'log_file']
+    search_fields = ['line']
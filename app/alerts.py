@@ -0,0 +1,175 @@
+import re
+import threading
+import time
+from collections import deque
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .models import AlertFiring, AlertRule
+
+ALERTS_GROUP = "alerts"
+
+
+class CompiledRule:
+    """A rule's pattern set plus its sliding window and cooldown state."""
+
+    def __init__(self, rule):
+        self.id = rule.id
+        self.name = rule.name
+        self.regex = re.compile(rule.build_pattern())
+        self.threshold = max(rule.threshold, 1)
+        self.window = rule.window_seconds
+        self.cooldown = rule.cooldown_seconds
+        # Only the last `threshold` match times matter, so the window never grows past that.
+        self.hits = deque(maxlen=self.threshold)
+        self.last_fired = None
+
+    def hit(self, now):
+        """Record a match; return the match count if the rule should fire."""
+        self.hits.append(now)
+        if len(self.hits) < self.threshold or now - self.hits[0] > self.window:
+            return None
+        if self.last_fired is not None and now - self.last_fired < self.cooldown:
+            return None
+        self.last_fired = now
+        count = len(self.hits)
+        self.hits.clear()
+        return count
+
+
+def _has_groupref(node):
+    """Return True if a parsed pattern refers to a group by number (\\1, (?(1)...))."""
+    if getattr(node, "name", "").startswith("GROUPREF"):
+        return True
+    if isinstance(node, (sre_parse.SubPattern, list, tuple)):
+        return any(_has_groupref(item) for item in node)
+    return False
+
+
+def can_combine(regex):
+    """Return True if `regex` still matches the same lines when joined with others.
+
+    Joining renumbers groups, which only matters for backreferences and
+    conditionals, and repeated group names would clash.
+    """
+    if regex.groupindex:
+        return False
+    return not _has_groupref(sre_parse.parse(regex.pattern, regex.flags))
+
+
+class FileMatcher:
+    """All rules scoped to one log file, behind a single combined regex."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.filtered = []
+        self.unfiltered = []
+        for r in rules:
+            (self.filtered if can_combine(r.regex) else self.unfiltered).append(r)
+        self.prefilter = re.compile("|".join(r.regex.pattern for r in self.filtered)) if self.filtered else None
+
+    def scan(self, line):
+        matched = [r for r in self.unfiltered if r.regex.search(line)]
+        # Almost every line fails here, so the per-rule regexes only run on hits.
+        if self.prefilter and self.prefilter.search(line):
+            matched += [r for r in self.filtered if r.regex.search(line)]
+        return matched
+
+
+class AlertEngine:
+    """Evaluates alert rules against lines read by the log handlers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._stale = True
+        self._rules = {}       # {rule_id: CompiledRule}
+        self._scopes = {}      # {rule_id: set of log_file_id}, empty set means all files
+        self._matchers = {}    # {log_file_id: FileMatcher or None}
+        self.channel_layer = get_channel_layer()
+
+    def reload(self):
+        """Mark rules stale; they are rebuilt from the database on next use."""
+        with self.lock:
+            self._stale = True
+            self._matchers = {}
+
+    def _load(self):
+        rules = {}
+        scopes = {}
+        for rule in AlertRule.objects.filter(is_active=True).prefetch_related("log_files"):
+            try:
+                compiled = CompiledRule(rule)
+            except re.error:
+                print(f"Skipping alert rule {rule}, invalid pattern.")
+                continue
+            if not compiled.regex.pattern:
+                continue
+            # Keep window/cooldown state for rules that survive a reload.
+            previous = self._rules.get(rule.id)
+            if previous and previous.regex.pattern == compiled.regex.pattern:
+                compiled.hits.extend(previous.hits)
+                compiled.last_fired = previous.last_fired
+            rules[rule.id] = compiled
+            scopes[rule.id] = {lf.id for lf in rule.log_files.all()}
+        self._rules = rules
+        self._scopes = scopes
+        self._stale = False
+
+    def matcher_for(self, log_id):
+        """Return the FileMatcher for a log file, or None if no rule applies."""
+        with self.lock:
+            if self._stale:
+                try:
+                    self._load()
+                except Exception as e:
+                    # Don't let a broken rule set stop tailing; retry on the next batch.
+                    print(f"Failed to load alert rules: {e}")
+                    return None
+            if log_id not in self._matchers:
+                rules = [
+                    r for rule_id, r in self._rules.items()
+                    if not self._scopes[rule_id] or log_id in self._scopes[rule_id]
+                ]
+                self._matchers[log_id] = FileMatcher(rules) if rules else None
+            return self._matchers[log_id]
+
+    def evaluate(self, matcher, log_id, line):
+        matched = matcher.scan(line)
+        if not matched:
+            return
+
+        now = time.monotonic()
+        try:
+            with self.lock:
+                fired = [(r, count) for r in matched if (count := r.hit(now))]
+
+            for rule, count in fired:
+                self.fire(rule, log_id, line, count)
+        except Exception as e:
+            # An alert failure must not stop the line from being tailed.
+            print(f"Failed to evaluate alert rules for log {log_id}: {e}")
+
+    def fire(self, rule, log_id, line, count):
+        firing = AlertFiring.objects.create(rule_id=rule.id, log_file_id=log_id, line=line, match_count=count)
+        async_to_sync(self.channel_layer.group_send)(
+            ALERTS_GROUP,
+            {
+                "type": "alert_message",
+                "rule_id": rule.id,
+                "rule": rule.name,
+                "log_id": log_id,
+                "line": line,
+                "count": count,
+                "fired_at": firing.created_at.isoformat(),
+            },
+        )
+
+
+# single shared engine instance
+alert_engine = AlertEngine()
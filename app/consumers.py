@@ -1,6 +1,8 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 import json
 
+from app.alerts import ALERTS_GROUP
+
 class LogConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.log_id = self.scope["url_route"]["kwargs"]["log_id"]
@@ -16,5 +18,32 @@ class LogConsumer(AsyncWebsocketConsumer):
     async def log_message(self, event):
         await self.send(text_data=json.dumps({
             "line": event["line"],
+            "summary": event.get("summary", False),
             "app": self.log_id,
         }))
+
+
+class AlertConsumer(AsyncWebsocketConsumer):
+    group_name = ALERTS_GROUP
+
+    async def connect(self):
+        # Alerts carry lines from every log file, so only signed in users get them.
+        if not self.scope["user"].is_authenticated:
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def alert_message(self, event):
+        await self.send(text_data=json.dumps({
+            "rule_id": event["rule_id"],
+            "rule": event["rule"],
+            "app": event["log_id"],
+            "line": event["line"],
+            "count": event["count"],
+            "fired_at": event["fired_at"],
+        }))
@@ -1,4 +1,6 @@
 import os
+import re
+import zlib
 
 
 def tail(filepath, lines=500):
@@ -15,3 +17,149 @@ def tail(filepath, lines=500):
             data = f.read(read_size) + data
             lines -= data.count(b"\n")
         return data.decode(errors="ignore").splitlines()[-500:]
+
+
+CHUNK_SIZE = 256 * 1024
+
+# Leading timestamp like "2025-09-09 02:55:00" or "[2025-09-09T02:55:00".
+TIMESTAMP_RE = re.compile(rb"^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+
+
+def normalize_timestamp(value):
+    """Return `value` as b"YYYY-MM-DD HH:MM:SS", or None if it isn't a timestamp."""
+    match = TIMESTAMP_RE.match(value.strip().encode())
+    if not match:
+        return None
+    return match.group(1) + b" " + match.group(2)
+
+
+def line_offset(f, line_no):
+    """Return the byte offset where 1-based line `line_no` starts."""
+    f.seek(0)
+    offset = 0
+    remaining = line_no - 1
+    while remaining > 0:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        count = chunk.count(b"\n")
+        if count < remaining:
+            remaining -= count
+            offset += len(chunk)
+            continue
+        pos = -1
+        for _ in range(remaining):
+            pos = chunk.index(b"\n", pos + 1)
+        return offset + pos + 1
+    return offset
+
+
+def _timestamp_at(f, offset, size):
+    """Return (line start, timestamp) of the first timestamped line at or after `offset`."""
+    if offset:
+        # Skip the rest of the line containing offset - 1, so a line starting at offset is kept.
+        f.seek(offset - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    while f.tell() < size:
+        start = f.tell()
+        match = TIMESTAMP_RE.match(f.readline())
+        if match:
+            return start, match.group(1) + b" " + match.group(2)
+    return size, None
+
+
+def time_offset(f, size, timestamp):
+    """Return the offset of the first line logged at or after `timestamp`.
+
+    Binary searches the file, so it assumes lines are written in time order.
+    Lines without a timestamp (e.g. tracebacks) belong to the line above.
+    """
+    low, high = 0, size
+    while low < high:
+        mid = (low + high) // 2
+        start, ts = _timestamp_at(f, mid, size)
+        if ts is None or ts >= timestamp:
+            high = mid
+        else:
+            low = start + 1
+    start, _ = _timestamp_at(f, low, size) if low else (0, None)
+    return start
+
+
+def resolve_range(filepath, start=None, end=None, from_line=None, to_line=None, since=None, until=None):
+    """Turn a byte, line or time selection into a byte range [start, end) of the file."""
+    size = os.path.getsize(filepath)
+    lo, hi = 0, size
+    with open(filepath, "rb") as f:
+        if start is not None:
+            lo = max(lo, start)
+        if end is not None:
+            hi = min(hi, end + 1)
+        if from_line is not None:
+            lo = max(lo, line_offset(f, from_line))
+        if to_line is not None:
+            hi = min(hi, line_offset(f, to_line + 1))
+        if since is not None:
+            lo = max(lo, time_offset(f, size, since))
+        if until is not None:
+            # Everything up to the first line past `until`, whole seconds included.
+            hi = min(hi, time_offset(f, size, until + b"\xff"))
+    return lo, max(lo, hi)
+
+
+def file_fingerprint(filepath, block_size=4096):
+    """Return a checksum of the first block of a file, which changes when it is truncated and refilled."""
+    with open(filepath, "rb") as f:
+        return zlib.crc32(f.read(block_size))
+
+
+def iter_file(filepath, start, end, compress=False):
+    """Yield the bytes of `filepath` in [start, end) in chunks, gzipped if `compress`."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if compressor:
+                chunk = compressor.compress(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range_header(header, size):
+    """Parse a single-range `Range` header against a body of `size` bytes.
+
+    Returns (start, end) inclusive, None when the header should be ignored
+    (missing, malformed or multiple ranges), or raises ValueError when the
+    range can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first and last and int(first) > int(last):
+        return None
+    if size == 0:
+        raise ValueError("Range not satisfiable")
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size:
+        raise ValueError("Range not satisfiable")
+    return first, last
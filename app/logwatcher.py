@@ -8,17 +8,29 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync, sync_to_async
 from watchdog.observers.polling import PollingObserver
 
+from .alerts import alert_engine
 from .models import LogFile
+from .storm import StormFilter
 
 
 class LogHandler:
-    def __init__(self, filepath, log_id, encoding="utf-8"):
+    def __init__(self, filepath, log_id, encoding="utf-8", storm=None):
         self.filepath = filepath
         self.log_id = log_id
         self.encoding = encoding
+        self.storm = storm  # StormFilter, or None to send every line
         self._pos = 0
+        # Bytes already in the file when the watcher started; alerts skip this history.
+        self._alert_from = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        self._summary_timer = None
         self.channel_layer = get_channel_layer()
 
+    def send(self, line, summary=False):
+        async_to_sync(self.channel_layer.group_send)(
+            f"logs_{self.log_id}",
+            {"type": "log_message", "line": line, "summary": summary},
+        )
+
     def process_file(self):
         try:
             file_size = os.path.getsize(self.filepath)
@@ -26,19 +38,68 @@ class LogHandler:
             # Handle truncation/rotation
             if file_size < self._pos:
                 self._pos = 0
+            if file_size < self._alert_from:
+                self._alert_from = 0
+
+            matcher = alert_engine.matcher_for(self.log_id)
+            storm = self.storm
+            history = self._alert_from - self._pos
 
-            with open(self.filepath, "r", encoding=self.encoding) as f:
+            # newline="" keeps line endings as written, so history byte counts stay exact.
+            with open(self.filepath, "r", encoding=self.encoding, newline="") as f:
                 f.seek(self._pos)
                 for line in f:
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"logs_{self.log_id}",
-                        {"type": "log_message", "line": line.strip()},
-                    )
+                    if history > 0:
+                        history -= len(line.encode(self.encoding))
+                        in_history = True
+                    else:
+                        in_history = False
+                    line = line.strip()
+                    if storm:
+                        for out, summary in storm.feed(line):
+                            self.send(out, summary)
+                    else:
+                        self.send(line)
+                    # Alerts see every new line, collapsed or not.
+                    if matcher and not in_history:
+                        alert_engine.evaluate(matcher, self.log_id, line)
                 self._pos = f.tell()
+                self._alert_from = 0
+
+            if storm:
+                self.flush_storm(storm)
 
         except FileNotFoundError:
             pass
 
+    def set_storm(self, storm):
+        """Swap the storm filter, reporting whatever the old one still holds."""
+        old = self.storm
+        self.stop()
+        self.storm = storm
+        if old:
+            for out, summary in old.flush(force=True):
+                self.send(out, summary)
+
+    def flush_storm(self, storm):
+        for out, summary in storm.flush():
+            self.send(out, summary)
+
+        # Report what was dropped even if the file goes quiet after the storm.
+        if storm is not self.storm:
+            return
+        due_in = storm.summary_due_in()
+        timer = self._summary_timer
+        if due_in is None or (timer and timer.is_alive() and timer is not threading.current_thread()):
+            return
+        self._summary_timer = threading.Timer(due_in, self.flush_storm, args=(storm,))
+        self._summary_timer.daemon = True
+        self._summary_timer.start()
+
+    def stop(self):
+        if self._summary_timer:
+            self._summary_timer.cancel()
+
 
 class DirectoryHandler(FileSystemEventHandler):
     def __init__(self, handlers):
@@ -94,13 +155,23 @@ class LogManager:
     def start_watcher(self, log_file):
         with self.lock:
             if log_file.id in self.file_handlers:
+                # Pick up storm mode changes without losing the read position.
+                handler = self.file_handlers[log_file.id]
+                current = handler.storm.settings if handler.storm else None
+                if StormFilter.settings_for(log_file) != current:
+                    handler.set_storm(StormFilter.from_log_file(log_file))
                 return
 
             if not os.path.exists(log_file.path):
                 print(f"Skipping {log_file.path}, file does not exist yet.")
                 return
 
-            handler = LogHandler(log_file.path, log_file.id, getattr(log_file, "encoding", "utf-8"))
+            handler = LogHandler(
+                log_file.path,
+                log_file.id,
+                getattr(log_file, "encoding", "utf-8"),
+                StormFilter.from_log_file(log_file),
+            )
             self.file_handlers[log_file.id] = handler
 
             directory = os.path.dirname(log_file.path) or "."
@@ -120,6 +191,7 @@ class LogManager:
             handler = self.file_handlers.pop(log_file_id, None)
             if not handler:
                 return
+            handler.stop()
 
             filepath = handler.filepath if hasattr(handler, "filepath") else path_hint
             directory = os.path.dirname(filepath) if filepath else None
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('patterns', models.TextField(help_text='One pattern per line.')),
+                ('is_regex', models.BooleanField(default=False, help_text='Treat patterns as regular expressions instead of plain text.')),
+                ('threshold', models.PositiveIntegerField(default=1, help_text='Number of matches needed to fire.')),
+                ('window_seconds', models.PositiveIntegerField(default=60, help_text='Time window the threshold is counted over.')),
+                ('cooldown_seconds', models.PositiveIntegerField(default=300, help_text='Minimum time between two firings.')),
+                ('is_active', models.BooleanField(default=True)),
+                ('log_files', models.ManyToManyField(blank=True, help_text='Leave empty to apply to all log files.', related_name='alert_rules', to='app.logfile')),
+            ],
+            options={
+                'db_table': 'alert_rules',
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertFiring',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('line', models.TextField()),
+                ('match_count', models.PositiveIntegerField()),
+                ('log_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_firings', to='app.logfile')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='firings', to='app.alertrule')),
+            ],
+            options={
+                'db_table': 'alert_firings',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
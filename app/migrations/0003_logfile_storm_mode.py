@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_alert_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logfile',
+            name='storm_burst',
+            field=models.PositiveIntegerField(default=500, help_text='Lines allowed in a burst before rate limiting.'),
+        ),
+        migrations.AddField(
+            model_name='logfile',
+            name='storm_mode',
+            field=models.BooleanField(default=False, help_text='Collapse repeated lines and rate limit the live stream.'),
+        ),
+        migrations.AddField(
+            model_name='logfile',
+            name='storm_rate',
+            field=models.PositiveIntegerField(default=100, help_text='Lines per second sent to viewers in storm mode.'),
+        ),
+        migrations.AddField(
+            model_name='logfile',
+            name='storm_summary_seconds',
+            field=models.PositiveIntegerField(default=5, help_text='Interval between dropped line summaries.'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_logfile_storm_mode'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertrule',
+            name='threshold',
+            field=models.PositiveIntegerField(default=1, help_text='Number of matches needed to fire.', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
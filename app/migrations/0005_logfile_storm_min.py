@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:39
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_alertrule_threshold_min'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logfile',
+            name='storm_burst',
+            field=models.PositiveIntegerField(default=500, help_text='Lines allowed in a burst before rate limiting.', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='logfile',
+            name='storm_rate',
+            field=models.PositiveIntegerField(default=100, help_text='Lines per second sent to viewers in storm mode.', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
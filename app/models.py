@@ -1,3 +1,7 @@
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 
 
@@ -13,6 +17,10 @@ class LogFile(TimestampBaseModel):
     name = models.CharField(max_length=255)
     path = models.CharField(max_length=255)
     encoding = models.CharField(max_length=20, default='utf-8')
+    storm_mode = models.BooleanField(default=False, help_text='Collapse repeated lines and rate limit the live stream.')
+    storm_rate = models.PositiveIntegerField(default=100, validators=[MinValueValidator(1)], help_text='Lines per second sent to viewers in storm mode.')
+    storm_burst = models.PositiveIntegerField(default=500, validators=[MinValueValidator(1)], help_text='Lines allowed in a burst before rate limiting.')
+    storm_summary_seconds = models.PositiveIntegerField(default=5, help_text='Interval between dropped line summaries.')
 
     def __str__(self):
         return f'({self.id}) {self.name}'
@@ -20,4 +28,50 @@ class LogFile(TimestampBaseModel):
     class Meta:
         db_table = 'log_files'
 
-    
+
+class AlertRule(TimestampBaseModel):
+    name = models.CharField(max_length=255)
+    patterns = models.TextField(help_text='One pattern per line.')
+    is_regex = models.BooleanField(default=False, help_text='Treat patterns as regular expressions instead of plain text.')
+    log_files = models.ManyToManyField(LogFile, blank=True, related_name='alert_rules',
+                                       help_text='Leave empty to apply to all log files.')
+    threshold = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)], help_text='Number of matches needed to fire.')
+    window_seconds = models.PositiveIntegerField(default=60, help_text='Time window the threshold is counted over.')
+    cooldown_seconds = models.PositiveIntegerField(default=300, help_text='Minimum time between two firings.')
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f'({self.id}) {self.name}'
+
+    def pattern_list(self):
+        return [p for p in (line.strip() for line in self.patterns.splitlines()) if p]
+
+    def build_pattern(self):
+        """Return the pattern set of this rule as a single regex source."""
+        parts = self.pattern_list() if self.is_regex else [re.escape(p) for p in self.pattern_list()]
+        return '|'.join(f'(?:{p})' for p in parts)
+
+    def clean(self):
+        if not self.pattern_list():
+            raise ValidationError({'patterns': 'At least one pattern is required.'})
+        try:
+            re.compile(self.build_pattern())
+        except re.error as e:
+            raise ValidationError({'patterns': f'Invalid pattern: {e}'})
+
+    class Meta:
+        db_table = 'alert_rules'
+
+
+class AlertFiring(TimestampBaseModel):
+    rule = models.ForeignKey(AlertRule, on_delete=models.CASCADE, related_name='firings')
+    log_file = models.ForeignKey(LogFile, on_delete=models.CASCADE, related_name='alert_firings')
+    line = models.TextField()
+    match_count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f'{self.rule.name} @ {self.created_at}'
+
+    class Meta:
+        db_table = 'alert_firings'
+        ordering = ['-created_at']
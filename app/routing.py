@@ -3,5 +3,6 @@ from django.urls import path
 from app import consumers
 
 websocket_urlpatterns = [
-    path('ws/logs/<int:log_id>', consumers.LogConsumer.as_asgi())
+    path('ws/logs/<int:log_id>', consumers.LogConsumer.as_asgi()),
+    path('ws/alerts', consumers.AlertConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
 from django.dispatch import receiver
 
+from app.alerts import alert_engine
 from app.logwatcher import log_manager
-from app.models import LogFile
+from app.models import AlertRule, LogFile
 
 
 @receiver(pre_save, sender=LogFile)
@@ -30,4 +31,18 @@ def logfile_post_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=LogFile)
 def logfile_deleted(sender, instance, **kwargs):
     """Clean up watcher when a LogFile is deleted."""
-    log_manager.stop_watcher(instance)
\ No newline at end of file
+    log_manager.stop_watcher(instance)
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+@receiver(m2m_changed, sender=AlertRule.log_files.through)
+def alertrule_changed(sender, **kwargs):
+    """Recompile alert matchers when a rule or its file scope changes."""
+    alert_engine.reload()
+
+
+@receiver(post_delete, sender=LogFile)
+def logfile_alerts_deleted(sender, instance, **kwargs):
+    """Drop the deleted file from cached alert scopes."""
+    alert_engine.reload()
@@ -0,0 +1,109 @@
+import re
+import threading
+import time
+
+# Variable parts of a line that don't change its meaning during a storm.
+TEMPLATE_RE = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|0x[0-9a-fA-F]+"
+    r"|\d+"
+)
+
+
+def line_template(line):
+    """Return `line` with ids, hex values and numbers masked out."""
+    return TEMPLATE_RE.sub("#", line)
+
+
+class StormFilter:
+    """Collapses repeated lines and rate limits what is sent to a log group.
+
+    `feed` takes one line and returns the messages to send for it, `flush`
+    returns what is still pending at the end of a read batch. Messages are
+    `(line, is_summary)` tuples. Every message except the periodic dropped
+    line summary is charged to the token bucket.
+    """
+
+    def __init__(self, rate, burst, summary_seconds):
+        self.settings = (rate, burst, summary_seconds)
+        self.rate = max(rate, 1)
+        self.burst = max(burst, 1)
+        self.summary_seconds = summary_seconds
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._last_template = None
+        self._last_sent = False
+        self._repeats = 0
+        self._dropped = 0
+        self._summary_at = self._refilled_at
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def settings_for(log_file):
+        """Return the storm settings of a LogFile, or None if storm mode is off."""
+        if not getattr(log_file, "storm_mode", False):
+            return None
+        return log_file.storm_rate, log_file.storm_burst, log_file.storm_summary_seconds
+
+    @classmethod
+    def from_log_file(cls, log_file):
+        settings = cls.settings_for(log_file)
+        return cls(*settings) if settings else None
+
+    def _take(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _flush_repeats(self, out):
+        if not self._repeats:
+            return
+        if self._take():
+            out.append((f"last line repeated {self._repeats} times", True))
+        else:
+            self._dropped += self._repeats
+        self._repeats = 0
+
+    def feed(self, line):
+        out = []
+        template = line_template(line)
+        with self.lock:
+            if template == self._last_template:
+                if self._last_sent:
+                    self._repeats += 1
+                else:
+                    # Viewers never saw the line, so its copies count as dropped.
+                    self._dropped += 1
+                return out
+
+            self._flush_repeats(out)
+            self._last_template = template
+            self._last_sent = self._take()
+            if self._last_sent:
+                out.append((line, False))
+            else:
+                self._dropped += 1
+        return out
+
+    def flush(self, force=False):
+        """Emit pending repeat counts, and drop counts once per summary interval (or now if `force`)."""
+        out = []
+        with self.lock:
+            self._flush_repeats(out)
+            now = time.monotonic()
+            if self._dropped and (force or now - self._summary_at >= self.summary_seconds):
+                out.append((f"{self._dropped} lines dropped by rate limit", True))
+                self._dropped = 0
+                self._summary_at = now
+        return out
+
+    def summary_due_in(self):
+        """Seconds until pending dropped lines should be reported, or None if there are none."""
+        with self.lock:
+            if not self._dropped:
+                return None
+            return max(self.summary_seconds - (time.monotonic() - self._summary_at), 0)
@@ -1,3 +1,536 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ValidationError
+from django.test import AsyncClient, SimpleTestCase, TestCase
+
+from app.alerts import ALERTS_GROUP, AlertEngine, CompiledRule, FileMatcher, alert_engine
+from app.consumers import AlertConsumer
+from app.helpers import (
+    file_fingerprint, iter_file, line_offset, normalize_timestamp, parse_range_header, resolve_range
+)
+from app.logwatcher import LogHandler, LogManager
+from app.models import AlertFiring, AlertRule, LogFile
+from authentication.models import User
+from app.storm import StormFilter, line_template
+from app.views import _aiter_file
+
+
+def compiled_rule(pk, patterns, is_regex=True, threshold=1):
+    return CompiledRule(AlertRule(id=pk, name=f'rule {pk}', patterns=patterns, is_regex=is_regex, threshold=threshold))
+
+
+class FileMatcherTests(SimpleTestCase):
+    def test_plain_patterns_are_escaped(self):
+        matcher = FileMatcher([compiled_rule(1, 'a.b', is_regex=False)])
+        self.assertEqual(matcher.scan('axb'), [])
+        self.assertEqual([r.id for r in matcher.scan('a.b')], [1])
+
+    def test_all_matching_rules_are_returned(self):
+        matcher = FileMatcher([compiled_rule(1, 'ERROR'), compiled_rule(2, 'OOM\nERROR')])
+        self.assertEqual(sorted(r.id for r in matcher.scan('ERROR boom')), [1, 2])
+        self.assertEqual(matcher.scan('all good'), [])
+
+    def test_backreferences_survive_combining(self):
+        matcher = FileMatcher([compiled_rule(1, '(x+)y'), compiled_rule(2, r'(ab)\1'), compiled_rule(3, 'OOM')])
+        self.assertEqual([r.id for r in matcher.scan('abab')], [2])
+        self.assertEqual([r.id for r in matcher.scan('xxy')], [1])
+        self.assertEqual([r.id for r in matcher.scan('OOM')], [3])
+
+    def test_only_group_references_skip_the_prefilter(self):
+        matcher = FileMatcher([
+            compiled_rule(1, r'(ERROR|FATAL): (\w+)'),
+            compiled_rule(2, r'(ab)\1'),
+            compiled_rule(3, r'(?P<code>5\d\d)'),
+            compiled_rule(4, r'(a)?(?(1)b|c)'),
+        ])
+        self.assertEqual([r.id for r in matcher.filtered], [1])
+        self.assertEqual(sorted(r.id for r in matcher.unfiltered), [2, 3, 4])
+        self.assertEqual([r.id for r in matcher.scan('FATAL: disk')], [1])
+        self.assertEqual(matcher.scan('WARN: disk'), [])
+
+
+class CompiledRuleTests(SimpleTestCase):
+    def test_fires_when_threshold_reached_in_window(self):
+        rule = compiled_rule(1, 'x', threshold=3)
+        rule.window = 10
+        self.assertIsNone(rule.hit(0))
+        self.assertIsNone(rule.hit(1))
+        self.assertEqual(rule.hit(2), 3)
+
+    def test_old_hits_fall_out_of_window(self):
+        rule = compiled_rule(1, 'x', threshold=2)
+        rule.window = 10
+        self.assertIsNone(rule.hit(0))
+        self.assertIsNone(rule.hit(20))
+        self.assertEqual(rule.hit(25), 2)
+
+    def test_cooldown_suppresses_firing(self):
+        rule = compiled_rule(1, 'x')
+        rule.cooldown = 60
+        self.assertEqual(rule.hit(0), 1)
+        self.assertIsNone(rule.hit(30))
+        self.assertEqual(rule.hit(61), 1)
+
+    def test_zero_threshold_is_clamped(self):
+        rule = compiled_rule(1, 'x', threshold=0)
+        self.assertEqual(rule.hit(0), 1)
+
+
+class AlertEngineTests(TestCase):
+    def setUp(self):
+        self.engine = AlertEngine()
+        self.engine.channel_layer = mock.Mock(group_send=mock.AsyncMock())
+        self.log_a = LogFile.objects.create(name='a', path='/nonexistent/a.log')
+        self.log_b = LogFile.objects.create(name='b', path='/nonexistent/b.log')
+
+    def rule_ids(self, log_id):
+        matcher = self.engine.matcher_for(log_id)
+        return sorted(r.id for r in matcher.rules) if matcher else []
+
+    def test_matcher_respects_rule_scope(self):
+        everywhere = AlertRule.objects.create(name='all', patterns='ERROR')
+        scoped = AlertRule.objects.create(name='a only', patterns='OOM')
+        scoped.log_files.add(self.log_a)
+        AlertRule.objects.create(name='off', patterns='WARN', is_active=False)
+
+        self.assertEqual(self.rule_ids(self.log_a.id), [everywhere.id, scoped.id])
+        self.assertEqual(self.rule_ids(self.log_b.id), [everywhere.id])
+
+    def test_matcher_is_none_without_rules(self):
+        rule = AlertRule.objects.create(name='a only', patterns='OOM')
+        rule.log_files.add(self.log_a)
+        self.assertIsNone(self.engine.matcher_for(self.log_b.id))
+
+    def test_window_and_cooldown_survive_reload(self):
+        rule = AlertRule.objects.create(name='err', patterns='ERROR', threshold=2, cooldown_seconds=300)
+        self.engine.evaluate(self.engine.matcher_for(self.log_a.id), self.log_a.id, 'ERROR one')
+        self.engine.reload()
+        self.engine.evaluate(self.engine.matcher_for(self.log_a.id), self.log_a.id, 'ERROR two')
+        self.assertEqual(AlertFiring.objects.get().match_count, 2)
+
+        self.engine.reload()
+        matcher = self.engine.matcher_for(self.log_a.id)
+        self.assertIsNotNone(matcher.rules[0].last_fired)
+        self.engine.evaluate(matcher, self.log_a.id, 'ERROR three')
+        self.engine.evaluate(matcher, self.log_a.id, 'ERROR four')
+        self.assertEqual(AlertFiring.objects.filter(rule=rule).count(), 1)
+
+    def test_changed_pattern_resets_state(self):
+        rule = AlertRule.objects.create(name='err', patterns='ERROR', threshold=2)
+        self.engine.evaluate(self.engine.matcher_for(self.log_a.id), self.log_a.id, 'ERROR one')
+        rule.patterns = 'ERROR\nFATAL'
+        rule.save()
+        self.engine.reload()
+        self.assertEqual(len(self.engine.matcher_for(self.log_a.id).rules[0].hits), 0)
+
+    def test_fire_stores_and_broadcasts(self):
+        rule = AlertRule.objects.create(name='err', patterns='ERROR')
+        self.engine.evaluate(self.engine.matcher_for(self.log_a.id), self.log_a.id, 'ERROR boom')
+
+        firing = AlertFiring.objects.get()
+        self.assertEqual((firing.rule, firing.log_file, firing.line, firing.match_count),
+                         (rule, self.log_a, 'ERROR boom', 1))
+        self.engine.channel_layer.group_send.assert_awaited_once()
+        group, event = self.engine.channel_layer.group_send.await_args.args
+        self.assertEqual(group, ALERTS_GROUP)
+        self.assertEqual(event['type'], 'alert_message')
+        self.assertEqual((event['rule_id'], event['log_id'], event['count']), (rule.id, self.log_a.id, 1))
+
+    def test_rule_changes_reload_engine(self):
+        with mock.patch.object(alert_engine, 'reload') as reload:
+            rule = AlertRule.objects.create(name='err', patterns='ERROR')
+            self.assertEqual(reload.call_count, 1)
+            rule.log_files.add(self.log_a)  # m2m_changed sends pre_add and post_add
+            self.assertEqual(reload.call_count, 3)
+            rule.delete()
+            self.assertGreater(reload.call_count, 3)
+
+
+class LogHandlerAlertTests(TestCase):
+    def setUp(self):
+        self.log = LogFile.objects.create(name='app', path='/nonexistent/app.log')
+        AlertRule.objects.create(name='err', patterns='ERROR')
+        engine = AlertEngine()
+        engine.channel_layer = mock.Mock(group_send=mock.AsyncMock())
+        patcher = mock.patch('app.logwatcher.alert_engine', engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.log', newline='') as f:
+            f.write('old ERROR from yesterday\r\nold ERROR again\nfine\n')
+        self.path = f.name
+        self.addCleanup(os.remove, self.path)
+
+    def handler(self):
+        handler = LogHandler(self.path, self.log.id)
+        handler.send = mock.Mock()
+        return handler
+
+    def append(self, text):
+        with open(self.path, 'a', newline='') as f:
+            f.write(text)
+
+    def test_history_is_streamed_but_not_alerted(self):
+        handler = self.handler()
+        self.append('new ERROR\n')
+        handler.process_file()
+
+        self.assertEqual(handler.send.call_count, 4)
+        self.assertEqual(list(AlertFiring.objects.values_list('line', flat=True)), ['new ERROR'])
+
+    def test_lines_after_truncation_are_alerted(self):
+        handler = self.handler()
+        with open(self.path, 'w') as f:
+            f.write('ERROR after rotate\n')
+        handler.process_file()
+
+        self.assertEqual(list(AlertFiring.objects.values_list('line', flat=True)), ['ERROR after rotate'])
+
+
+class AlertConsumerTests(SimpleTestCase):
+    def consumer(self, is_authenticated):
+        consumer = AlertConsumer()
+        consumer.scope = {'user': mock.Mock(is_authenticated=is_authenticated)}
+        consumer.channel_name = 'test'
+        consumer.channel_layer = mock.Mock(group_add=mock.AsyncMock())
+        consumer.accept = mock.AsyncMock()
+        consumer.close = mock.AsyncMock()
+        return consumer
+
+    def test_anonymous_is_rejected(self):
+        consumer = self.consumer(is_authenticated=False)
+        async_to_sync(consumer.connect)()
+        consumer.close.assert_awaited_once()
+        consumer.accept.assert_not_awaited()
+        consumer.channel_layer.group_add.assert_not_awaited()
+
+    def test_signed_in_user_joins_alerts_group(self):
+        consumer = self.consumer(is_authenticated=True)
+        async_to_sync(consumer.connect)()
+        consumer.channel_layer.group_add.assert_awaited_once_with(ALERTS_GROUP, 'test')
+        consumer.accept.assert_awaited_once()
+
+
+class StormFilterTests(SimpleTestCase):
+    def setUp(self):
+        # Freeze the clock so the bucket never refills unless a test moves it.
+        self.now = 1000.0
+        patcher = mock.patch('app.storm.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_filter(self, storm, lines):
+        out = []
+        for line in lines:
+            out += storm.feed(line)
+        return out + storm.flush()
+
+    def test_template_masks_variable_parts(self):
+        self.assertEqual(line_template('req 12 id 0xff uuid 123e4567-e89b-12d3-a456-426614174000'),
+                         line_template('req 99 id 0x1a uuid 00000000-0000-0000-0000-000000000000'))
+
+    def test_repeats_are_collapsed(self):
+        storm = StormFilter(rate=10, burst=10, summary_seconds=0)
+        out = self.run_filter(storm, ['start'] + [f'req {i} failed' for i in range(1000)] + ['end'])
+        self.assertEqual(out, [
+            ('start', False),
+            ('req 0 failed', False),
+            ('last line repeated 999 times', True),
+            ('end', False),
+        ])
+
+    def test_interleaved_repeats_stay_within_rate_limit(self):
+        storm = StormFilter(rate=10, burst=10, summary_seconds=0)
+        lines = []
+        for i in range(20000):
+            lines += [f'A {i}', f'A {i}', 'B x']
+        out = self.run_filter(storm, lines)
+        # The burst plus one dropped line summary.
+        self.assertEqual(len(out), 11)
+        self.assertEqual(out[-1], ('59990 lines dropped by rate limit', True))
+
+    def test_repeats_of_dropped_line_count_as_dropped(self):
+        storm = StormFilter(rate=1, burst=1, summary_seconds=0)
+        out = self.run_filter(storm, ['first', 'second', 'second', 'second'])
+        self.assertEqual(out, [('first', False), ('3 lines dropped by rate limit', True)])
+
+    def test_dropped_summary_waits_for_interval(self):
+        storm = StormFilter(rate=1, burst=1, summary_seconds=5)
+        out = self.run_filter(storm, ['a', 'b', 'c'])
+        self.assertEqual(out, [('a', False)])
+        self.assertEqual(storm.summary_due_in(), 5)
+        self.now += 5
+        self.assertEqual(storm.flush(), [('2 lines dropped by rate limit', True)])
+        self.assertIsNone(storm.summary_due_in())
+
+    def test_zero_rate_is_clamped(self):
+        storm = StormFilter(rate=0, burst=1, summary_seconds=60)
+        self.assertEqual(len(self.run_filter(storm, ['a', 'b'])), 1)
+        self.now += 1
+        self.assertEqual(self.run_filter(storm, ['c']), [('c', False)])
+
+    def test_force_flush_reports_drops_early(self):
+        storm = StormFilter(rate=1, burst=1, summary_seconds=60)
+        self.run_filter(storm, ['a', 'b'])
+        self.assertEqual(storm.flush(force=True), [('1 lines dropped by rate limit', True)])
+
+    def test_bucket_refills_over_time(self):
+        storm = StormFilter(rate=2, burst=2, summary_seconds=60)
+        self.assertEqual(len(self.run_filter(storm, ['a', 'b', 'c'])), 2)
+        self.now += 1
+        self.assertEqual(self.run_filter(storm, ['d', 'e', 'f']), [('d', False), ('e', False)])
+
+
+class RangeTests(SimpleTestCase):
+    def setUp(self):
+        lines = []
+        for i in range(300):
+            lines.append(f'2025-01-01 00:{i // 60:02d}:{i % 60:02d} msg {i}\n')
+            if i % 3 == 0:
+                lines.append('  continued\n')
+        self.data = ''.join(lines).encode()
+        with tempfile.NamedTemporaryFile('wb', delete=False) as f:
+            f.write(self.data)
+        self.path = f.name
+        self.addCleanup(os.remove, self.path)
+
+    def select(self, **kwargs):
+        for key in ('since', 'until'):
+            if key in kwargs:
+                kwargs[key] = normalize_timestamp(kwargs[key])
+        start, end = resolve_range(self.path, **kwargs)
+        return self.data[start:end].decode()
+
+    def test_line_offset(self):
+        with open(self.path, 'rb') as f:
+            self.assertEqual(line_offset(f, 1), 0)
+            self.assertEqual(line_offset(f, 2), self.data.index(b'\n') + 1)
+            self.assertEqual(line_offset(f, 10000), len(self.data))
+
+    def test_line_range(self):
+        self.assertEqual(self.select(from_line=2, to_line=3), '  continued\n2025-01-01 00:00:01 msg 1\n')
+        self.assertEqual(self.select(from_line=1, to_line=1), '2025-01-01 00:00:00 msg 0\n')
+
+    def test_byte_range_is_inclusive(self):
+        self.assertEqual(self.select(start=5, end=9), self.data[5:10].decode())
+
+    def test_time_range_keeps_continuation_lines(self):
+        self.assertEqual(self.select(since='2025-01-01T00:01:00', until='2025-01-01 00:01:01'),
+                         '2025-01-01 00:01:00 msg 60\n  continued\n2025-01-01 00:01:01 msg 61\n')
+
+    def test_time_range_boundaries(self):
+        self.assertEqual(self.select(since='2024-01-01 00:00:00'), self.data.decode())
+        self.assertEqual(self.select(since='2026-01-01 00:00:00'), '')
+        self.assertEqual(self.select(until='2024-01-01 00:00:00'), '')
+        self.assertTrue(self.select(since='2025-01-01 00:04:59').startswith('2025-01-01 00:04:59 msg 299'))
+
+    def test_normalize_timestamp(self):
+        self.assertEqual(normalize_timestamp('[2025-01-01T00:00:01.5'), b'2025-01-01 00:00:01')
+        self.assertIsNone(normalize_timestamp('yesterday'))
+
+    def test_iter_file_gzip(self):
+        body = b''.join(iter_file(self.path, 10, 5000, compress=True))
+        self.assertEqual(gzip.decompress(body), self.data[10:5000])
+
+    def test_fingerprint_changes_on_refill(self):
+        before = file_fingerprint(self.path)
+        with open(self.path, 'ab') as f:
+            f.write(b'appended\n')
+        self.assertEqual(file_fingerprint(self.path), before)
+        with open(self.path, 'wb') as f:
+            f.write(self.data.replace(b'msg', b'MSG'))
+        self.assertNotEqual(file_fingerprint(self.path), before)
+
+
+class ParseRangeHeaderTests(SimpleTestCase):
+    def test_ignored_headers(self):
+        for header in (None, '', 'bytes=-', 'items=0-1', 'bytes=0-1,4-5', 'bytes=5-3'):
+            self.assertIsNone(parse_range_header(header, 100), header)
+
+    def test_ranges(self):
+        self.assertEqual(parse_range_header('bytes=10-19', 100), (10, 19))
+        self.assertEqual(parse_range_header('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=90-500', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=-25', 100), (75, 99))
+        self.assertEqual(parse_range_header('bytes=-500', 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        for header, size in (('bytes=100-', 100), ('bytes=-0', 100), ('bytes=-5', 0), ('bytes=0-', 0)):
+            with self.assertRaises(ValueError, msg=header):
+                parse_range_header(header, size)
+
+
+class AiterFileTests(SimpleTestCase):
+    def test_cancel_waits_for_pending_read(self):
+        started = threading.Event()
+        release = threading.Event()
+        closed = []
+
+        def chunks():
+            try:
+                yield b'first'
+                started.set()
+                release.wait(5)
+                yield b'second'
+            finally:
+                closed.append(True)
+
+        async def consume(stream):
+            async for _ in stream:
+                pass
+
+        async def run():
+            task = asyncio.ensure_future(consume(_aiter_file(chunks())))
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertEqual(closed, [True])
+
+
+class StormSettingsTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'app.log')
+        open(path, 'w').close()
+        self.log = LogFile(id=1, name='app', path=path, storm_mode=True,
+                           storm_rate=1, storm_burst=1, storm_summary_seconds=60)
+        self.manager = LogManager()
+        self.manager.start_watcher(self.log)
+        self.addCleanup(self.manager.stop_watcher_by_id, self.log.id)
+        self.handler = self.manager.file_handlers[self.log.id]
+        self.handler.send = mock.Mock()
+
+    def test_rate_and_burst_must_be_positive(self):
+        for field in ('storm_rate', 'storm_burst'):
+            log = LogFile(name='app', path='/tmp/app.log', **{field: 0})
+            with self.assertRaises(ValidationError) as ctx:
+                log.full_clean()
+            self.assertIn(field, ctx.exception.message_dict)
+
+    def test_unrelated_save_keeps_filter(self):
+        storm = self.handler.storm
+        self.log.name = 'renamed'
+        self.manager.start_watcher(self.log)
+        self.assertIs(self.handler.storm, storm)
+
+    def test_changed_settings_flush_old_filter(self):
+        storm = self.handler.storm
+        storm.feed('a')
+        storm.feed('b')
+        self.log.storm_rate = 10
+        self.manager.start_watcher(self.log)
+
+        self.assertIsNot(self.handler.storm, storm)
+        self.assertEqual(self.handler.storm.settings, (10, 1, 60))
+        self.handler.send.assert_called_once_with('1 lines dropped by rate limit', True)
+
+    def test_disabling_storm_mode_removes_filter(self):
+        self.log.storm_mode = False
+        self.manager.start_watcher(self.log)
+        self.assertIsNone(self.handler.storm)
+
+
+@mock.patch('app.signals.log_manager', mock.Mock())
+class LogExportViewTests(TestCase):
+    def setUp(self):
+        self.data = ''.join(f'2025-01-01 00:00:{i:02d} msg {i}\n' for i in range(60)).encode()
+        with tempfile.NamedTemporaryFile('wb', delete=False, suffix='.log') as f:
+            f.write(self.data)
+        self.addCleanup(os.remove, f.name)
+        self.log = LogFile.objects.create(name='app', path=f.name)
+        self.url = f'/log/{self.log.id}/export'
+        self.user = User.objects.create_user('user', password='password')
+        self.client.force_login(self.user)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_anonymous_redirects_to_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/authentication/login', response['Location'])
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(self.body(response), self.data)
+
+    def test_range_with_matching_if_range(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.body(response), self.data[10:20])
+
+    def test_range_applies_to_selection(self):
+        response = self.client.get(self.url + '?from_line=2&to_line=3', HTTP_RANGE='bytes=-5')
+        lines = self.data.splitlines(keepends=True)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), b''.join(lines[1:3])[-5:])
+
+    def test_mismatched_if_range_sends_full_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Range', response)
+        self.assertEqual(self.body(response), self.data)
+
+    def test_etag_changes_when_file_is_refilled(self):
+        etag = self.client.get(self.url)['ETag']
+        with open(self.log.path, 'wb') as f:
+            f.write(self.data.replace(b'msg', b'MSG'))
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_gzip_ignores_range(self):
+        response = self.client.get(self.url + '?gzip=1', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'none')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(gzip.decompress(self.body(response)), self.data)
+
+    def test_missing_file(self):
+        self.log.path = '/nonexistent/app.log'
+        self.log.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(f'/log/{self.log.id + 1}/export').status_code, 404)
+
+    def test_bad_params(self):
+        for query in ('start=abc', 'from_line=0', 'since=yesterday', 'start=20&end=10',
+                      'from_line=5&to_line=2', 'since=2025-01-02 00:00:00&until=2025-01-01 00:00:00'):
+            self.assertEqual(self.client.get(f'{self.url}?{query}').status_code, 400, query)
+
+    def test_async_range_download(self):
+        async def run():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            response = await client.get(self.url, headers={'Range': 'bytes=-25'})
+            body = b''.join([chunk async for chunk in response.streaming_content])
+            return response, body
+
+        response, body = async_to_sync(run)()
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes {len(self.data) - 25}-{len(self.data) - 1}/{len(self.data)}')
+        self.assertEqual(body, self.data[-25:])
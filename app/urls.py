@@ -5,4 +5,5 @@ from app import views
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
     path('log/<int:log_id>', views.LogDetailView.as_view(), name='log_detail'),
+    path('log/<int:log_id>/export', views.LogExportView.as_view(), name='log_export'),
 ]
\ No newline at end of file
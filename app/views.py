@@ -1,8 +1,18 @@
+import asyncio
+import os
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView, DetailView
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header
+from django.views.generic import ListView, DetailView, View
 
-from app.helpers import tail
+from app.helpers import (
+    file_fingerprint, iter_file, normalize_timestamp, parse_range_header, resolve_range, tail
+)
 from app.models import LogFile
 
 
@@ -30,3 +40,111 @@ class LogDetailView(LoginRequiredMixin, DetailView):
         ctx['lines'] = lines
         return ctx
 
+
+async def _aiter_file(chunks):
+    """Pull chunks from a blocking file iterator in a worker thread."""
+    next_chunk = sync_to_async(next, thread_sensitive=False)
+    pending = None
+    try:
+        while True:
+            # Shielded so a client disconnect can't abandon a read that is still running.
+            pending = asyncio.ensure_future(next_chunk(chunks, None))
+            chunk = await asyncio.shield(pending)
+            pending = None
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # A generator can't be closed while another thread is running it.
+        if pending is not None:
+            await asyncio.wait([pending])
+        await sync_to_async(chunks.close, thread_sensitive=False)()
+
+
+class LogExportView(LoginRequiredMixin, View):
+    """Stream a log file, or a byte/line/time range of it, as a download.
+
+    Query params: start/end (bytes, inclusive), from_line/to_line (1-based,
+    inclusive), since/until (timestamps) and gzip=1. Plain downloads honor
+    HTTP Range requests so they can be resumed.
+    """
+
+    def get(self, request, log_id):
+        log_file = get_object_or_404(LogFile, pk=log_id)
+        try:
+            selection = self.get_selection(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        try:
+            stat = os.stat(log_file.path)
+            fingerprint = file_fingerprint(log_file.path)
+            lo, hi = resolve_range(log_file.path, **selection)
+        except FileNotFoundError:
+            raise Http404('Log file not found')
+
+        compress = request.GET.get('gzip') == '1'
+        filename = os.path.basename(log_file.path)
+        size = hi - lo
+        # Appends keep the inode and (once it is full) the first block; rotation or
+        # copytruncate and refill change one of them, so a resume can't splice two files.
+        etag = f'"{stat.st_ino:x}-{fingerprint:x}-{lo:x}"'
+        status = 200
+        content_range = None
+
+        if not compress:
+            if_range = request.headers.get('If-Range')
+            if if_range is None or if_range == etag:
+                try:
+                    byte_range = parse_range_header(request.headers.get('Range'), size)
+                except ValueError:
+                    response = HttpResponse(status=416)
+                    response['Content-Range'] = f'bytes */{size}'
+                    return response
+                if byte_range:
+                    first, last = byte_range
+                    content_range = f'bytes {first}-{last}/{size}'
+                    lo, hi = lo + first, lo + last + 1
+                    status = 206
+
+        chunks = iter_file(log_file.path, lo, hi, compress)
+        response = StreamingHttpResponse(
+            _aiter_file(chunks) if isinstance(request, ASGIRequest) else chunks,
+            status=status,
+            content_type='application/gzip' if compress else 'text/plain',
+        )
+        response['Content-Disposition'] = content_disposition_header(
+            True, f'{filename}.gz' if compress else filename
+        )
+        if compress:
+            response['Accept-Ranges'] = 'none'
+        else:
+            response['Accept-Ranges'] = 'bytes'
+            response['Content-Length'] = str(hi - lo)
+            response['ETag'] = etag
+            if content_range:
+                response['Content-Range'] = content_range
+        return response
+
+    def get_selection(self, request):
+        selection = {}
+        for key in ('start', 'end', 'from_line', 'to_line'):
+            value = request.GET.get(key)
+            if value:
+                if not value.isdigit():
+                    raise ValueError(f'{key} must be a non-negative integer')
+                selection[key] = int(value)
+        for key in ('from_line', 'to_line'):
+            if selection.get(key) == 0:
+                raise ValueError(f'{key} starts at 1')
+        for key in ('since', 'until'):
+            value = request.GET.get(key)
+            if value:
+                timestamp = normalize_timestamp(value)
+                if timestamp is None:
+                    raise ValueError(f'{key} must look like YYYY-MM-DD HH:MM:SS')
+                selection[key] = timestamp
+        for first, last in (('start', 'end'), ('from_line', 'to_line'), ('since', 'until')):
+            if first in selection and last in selection and selection[first] > selection[last]:
+                raise ValueError(f'{first} must not be after {last}')
+        return selection